@@ -20,9 +20,28 @@ class NSEConfig:
     # Request timeout
     REQUEST_TIMEOUT = 15
     
+    # Connection pooling (keep-alive connections to nseindia.com)
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 20
+    
+    # Concurrent symbol fetches
+    MAX_WORKERS = 4
+    
+    # Response cache (seconds)
+    CACHE_DIR = '.cache'
+    CACHE_TTL = 60
+    CACHE_TTL_OFF_HOURS = 86400
+    
+    # Saved NSE cookies (skips the warm-up request when still valid)
+    COOKIE_FILE = f"{CACHE_DIR}/nse_cookies.txt"
+    # Max age (seconds) of saved session cookies, which carry no expiry of their own
+    COOKIE_MAX_AGE = 1800
+    
     # Retry settings
     MAX_RETRIES = 3
     RETRY_DELAY = 5
+    RETRY_BACKOFF = 0.5
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
 
 
 class AnalysisConfig:
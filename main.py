@@ -3,7 +3,6 @@ Main Entry Point for NSE Option Chain Analyzer
 """
 
 import logging
-from datetime import datetime
 from src.data_fetcher import NSEDataFetcher
 from src.analyzer import OptionChainAnalyzer
 from src.indicators import OptionIndicators
@@ -47,9 +46,10 @@ def main():
     
     # Perform analysis
     print("\nAnalyzing...")
-    pcr_oi, pcr_vol = analyzer.calculate_pcr(df)
-    max_pain = analyzer.calculate_max_pain(df)
-    oi_changes = analyzer.analyze_oi_changes(df)
+    core = analyzer.compute_all(df)
+    pcr_oi, pcr_vol = core['pcr']['oi'], core['pcr']['volume']
+    max_pain = core['max_pain']
+    oi_changes = core['oi_changes']
     iv_skew = indicators.calculate_iv_skew(df, spot_price)
     liquidity = indicators.analyze_liquidity(df)
     volume_oi = indicators.calculate_volume_oi_ratio(df)
@@ -5,13 +5,26 @@ Core analysis logic for option chain data
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple
-import sys
-import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Recently parsed frames keyed by symbol and snapshot timestamp (LRU).
+# Only pays off for long-running callers that poll and re-parse the same
+# snapshot; main.py parses once per process and never hits it.
+PARSE_CACHE_SIZE = 8
+_parse_cache: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
 
-from config import AnalysisConfig
+
+@dataclass(slots=True, frozen=True)
+class OIAnalysis:
+    """
+    Open Interest change summary
+    """
+    call_build: bool
+    put_build: bool
+    net_call_change: int
+    net_put_change: int
 
 
 class OptionChainAnalyzer:
@@ -19,110 +32,205 @@ class OptionChainAnalyzer:
     Analyzes option chain data and calculates key metrics
     """
     
-    @staticmethod
-    def parse_option_data(raw_data: Dict) -> pd.DataFrame:
+    # Per-side option fields: column suffix -> (NSE JSON key, storage dtype).
+    # OI/volume fit comfortably in int32; two-decimal IV/price quotes stay float64.
+    OPTION_FIELDS = {
+        'OI': ('openInterest', np.int32),
+        'changeInOI': ('changeinOpenInterest', np.int32),
+        'volume': ('totalTradedVolume', np.int32),
+        'IV': ('impliedVolatility', np.float64),
+        'LTP': ('lastPrice', np.float64),
+        'bid': ('bidprice', np.float64),
+        'ask': ('askPrice', np.float64),
+    }
+    
+    @classmethod
+    def parse_option_data(cls, raw_data: Dict) -> pd.DataFrame:
         """Parse raw NSE option chain data into DataFrame"""
         if not raw_data or 'records' not in raw_data:
             return pd.DataFrame()
         
-        records = raw_data['records']['data']
-        parsed_data = []
+        snapshot = raw_data['records']
+        records = snapshot['data']
         
-        for record in records:
-            strike = record.get('strikePrice', 0)
-            
-            row = {
-                'strike': strike,
-                'expiryDate': record.get('expiryDate', ''),
-            }
-            
-            # Call data
-            if 'CE' in record:
-                ce = record['CE']
-                row.update({
-                    'CE_OI': ce.get('openInterest', 0),
-                    'CE_changeInOI': ce.get('changeinOpenInterest', 0),
-                    'CE_volume': ce.get('totalTradedVolume', 0),
-                    'CE_IV': ce.get('impliedVolatility', 0),
-                    'CE_LTP': ce.get('lastPrice', 0),
-                    'CE_bid': ce.get('bidprice', 0),
-                    'CE_ask': ce.get('askPrice', 0),
-                })
+        # Rate-limited NSE polls often return identical snapshots; reuse the parse.
+        # NSE stamps every snapshot, so key on that rather than hashing the payload.
+        # The cache is shared across symbols, so the underlying is part of the key
+        first = records[0] if records else {}
+        underlying = (first.get('CE') or first.get('PE') or {}).get('underlying')
+        timestamp = snapshot.get('timestamp')
+        if timestamp is None or underlying is None:
+            return cls.parse_records(records)
+        
+        cache_key = (underlying, timestamp, snapshot.get('underlyingValue'), len(records))
+        cached = _parse_cache.get(cache_key)
+        if cached is not None:
+            _parse_cache.move_to_end(cache_key)
+            return cached.copy(deep=False)
+        
+        df = cls.parse_records(records)
+        
+        _parse_cache[cache_key] = df
+        if len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+        
+        # Callers (e.g. indicators) add columns, so hand out a shallow copy
+        return df.copy(deep=False)
+    
+    @classmethod
+    def parse_records(cls, records: Iterable[Dict]) -> pd.DataFrame:
+        """
+        Parse option chain records into DataFrame
+        
+        Records are consumed one at a time, so any iterable works, including
+        a generator fed by a streaming decoder.
+        
+        Args:
+            records: Entries of the NSE ``records['data']`` list
             
-            # Put data
-            if 'PE' in record:
-                pe = record['PE']
-                row.update({
-                    'PE_OI': pe.get('openInterest', 0),
-                    'PE_changeInOI': pe.get('changeinOpenInterest', 0),
-                    'PE_volume': pe.get('totalTradedVolume', 0),
-                    'PE_IV': pe.get('impliedVolatility', 0),
-                    'PE_LTP': pe.get('lastPrice', 0),
-                    'PE_bid': pe.get('bidprice', 0),
-                    'PE_ask': pe.get('askPrice', 0),
-                })
+        Returns:
+            Option chain DataFrame, one row per record
+        """
+        # Build one list per column rather than one dict per row
+        strike_col = []
+        expiry_col = []
+        columns = {}
+        dtypes = {}
+        sides = []
+        for side in ('CE', 'PE'):
+            fields = []
+            for suffix, (key, dtype) in cls.OPTION_FIELDS.items():
+                name = f'{side}_{suffix}'
+                column = columns[name] = []
+                dtypes[name] = dtype
+                fields.append((column, key))
+            sides.append((side, fields))
+        
+        for record in records:
+            strike_col.append(record.get('strikePrice') or 0)
+            expiry_col.append(record.get('expiryDate') or '')
             
-            parsed_data.append(row)
+            # Missing call/put sides and null fields are filled with zeros here,
+            # so the frame never needs a fillna pass
+            for side, fields in sides:
+                option = record.get(side) or {}
+                for column, key in fields:
+                    column.append(option.get(key) or 0)
         
-        df = pd.DataFrame(parsed_data)
-        df = df.fillna(0)
+        # Convert each list once, straight to its storage dtype
+        df = pd.DataFrame({
+            'strike': np.array(strike_col),
+            # Only a handful of expiries repeat across every strike
+            'expiryDate': pd.Categorical(expiry_col),
+            **{name: np.array(columns[name], dtype=dtype) for name, dtype in dtypes.items()},
+        }, copy=False)
         return df
     
     @staticmethod
     def calculate_pcr(df: pd.DataFrame) -> Tuple[float, float]:
         """Calculate Put-Call Ratio (PCR)"""
-        total_call_oi = df['CE_OI'].sum()
-        total_put_oi = df['PE_OI'].sum()
-        pcr_oi = total_put_oi / total_call_oi if total_call_oi > 0 else 0
+        # All four totals as one column-block reduction; int32 columns sum in int64
+        totals = df[['CE_OI', 'PE_OI', 'CE_volume', 'PE_volume']].to_numpy().sum(axis=0, dtype=np.int64)
+        return OptionChainAnalyzer._pcr(*totals)
+    
+    @staticmethod
+    def calculate_max_pain(df: pd.DataFrame) -> int:
+        """Calculate Max Pain strike"""
+        return OptionChainAnalyzer._max_pain(
+            df['strike'].to_numpy(), df['CE_OI'].to_numpy(), df['PE_OI'].to_numpy()
+        )
+    
+    @staticmethod
+    def analyze_oi_changes(df: pd.DataFrame) -> OIAnalysis:
+        """Analyze Open Interest changes"""
+        return OptionChainAnalyzer._oi_changes(
+            df['CE_changeInOI'].to_numpy(), df['PE_changeInOI'].to_numpy()
+        )
+    
+    @staticmethod
+    def compute_all(df: pd.DataFrame) -> Dict:
+        """Calculate PCR, Max Pain and OI changes, extracting each column once"""
+        strikes = df['strike'].to_numpy()
+        ce_oi = df['CE_OI'].to_numpy()
+        pe_oi = df['PE_OI'].to_numpy()
+        ce_change = df['CE_changeInOI'].to_numpy()
+        pe_change = df['PE_changeInOI'].to_numpy()
+        ce_vol = df['CE_volume'].to_numpy()
+        pe_vol = df['PE_volume'].to_numpy()
         
-        total_call_vol = df['CE_volume'].sum()
-        total_put_vol = df['PE_volume'].sum()
+        pcr_oi, pcr_vol = OptionChainAnalyzer._pcr(
+            ce_oi.sum(dtype=np.int64), pe_oi.sum(dtype=np.int64),
+            ce_vol.sum(dtype=np.int64), pe_vol.sum(dtype=np.int64)
+        )
+        
+        return {
+            'pcr': {'oi': pcr_oi, 'volume': pcr_vol},
+            'max_pain': OptionChainAnalyzer._max_pain(strikes, ce_oi, pe_oi),
+            'oi_changes': OptionChainAnalyzer._oi_changes(ce_change, pe_change),
+        }
+    
+    @staticmethod
+    def _pcr(total_call_oi, total_put_oi, total_call_vol, total_put_vol) -> Tuple[float, float]:
+        """PCR by OI and by volume from call/put OI and volume totals"""
+        pcr_oi = total_put_oi / total_call_oi if total_call_oi > 0 else 0
         pcr_vol = total_put_vol / total_call_vol if total_call_vol > 0 else 0
         
         return round(pcr_oi, 3), round(pcr_vol, 3)
     
     @staticmethod
-    def calculate_max_pain(df: pd.DataFrame) -> int:
-        """Calculate Max Pain strike"""
-        strikes = df['strike'].unique()
-        min_pain = float('inf')
-        max_pain_strike = 0
+    def _max_pain(row_strikes: np.ndarray, ce_oi: np.ndarray, pe_oi: np.ndarray) -> int:
+        """Max Pain strike from column arrays"""
+        if len(row_strikes) == 0:
+            return 0
         
-        for strike in strikes:
-            total_pain = 0
-            
-            call_pain = df[df['strike'] < strike].apply(
-                lambda x: (strike - x['strike']) * x['CE_OI'], axis=1
-            ).sum()
-            
-            put_pain = df[df['strike'] > strike].apply(
-                lambda x: (x['strike'] - strike) * x['PE_OI'], axis=1
-            ).sum()
-            
-            total_pain = call_pain + put_pain
-            
-            if total_pain < min_pain:
-                min_pain = total_pain
-                max_pain_strike = strike
+        # NSE rows usually arrive sorted already, which makes this sort cheap
+        order = np.argsort(row_strikes, kind='stable')
+        row_strikes = row_strikes[order]
+        ce_oi = ce_oi.astype(np.int64)[order]
+        pe_oi = pe_oi.astype(np.int64)[order]
+        
+        # Candidate expiry strikes: the distinct values of the sorted column
+        distinct = np.empty(len(row_strikes), dtype=bool)
+        distinct[0] = True
+        np.not_equal(row_strikes[1:], row_strikes[:-1], out=distinct[1:])
+        strikes = row_strikes[distinct]
+        
+        # Prefix sums of OI and OI-weighted strike, with a leading zero
+        ce_cum = np.concatenate(([0], np.cumsum(ce_oi)))
+        ce_x_cum = np.concatenate(([0], np.cumsum(ce_oi * row_strikes)))
+        pe_cum = np.concatenate(([0], np.cumsum(pe_oi)))
+        pe_x_cum = np.concatenate(([0], np.cumsum(pe_oi * row_strikes)))
+        
+        # Rows strictly below / at-or-below each candidate strike
+        below = np.searchsorted(row_strikes, strikes, side='left')
+        upto = np.searchsorted(row_strikes, strikes, side='right')
         
-        return int(max_pain_strike)
+        call_pain = strikes * ce_cum[below] - ce_x_cum[below]
+        put_pain = (pe_x_cum[-1] - pe_x_cum[upto]) - strikes * (pe_cum[-1] - pe_cum[upto])
+        
+        return int(strikes[np.argmin(call_pain + put_pain)])
     
     @staticmethod
-    def analyze_oi_changes(df: pd.DataFrame) -> Dict:
-        """Analyze Open Interest changes"""
-        call_oi_increase = df[df['CE_changeInOI'] > 0]['CE_changeInOI'].sum()
-        call_oi_decrease = abs(df[df['CE_changeInOI'] < 0]['CE_changeInOI'].sum())
+    def _oi_changes(ce_change: np.ndarray, pe_change: np.ndarray) -> OIAnalysis:
+        """OI build-up summary from change-in-OI arrays"""
+        # Widen first: np.dot keeps the input dtype for its accumulator
+        ce_change = ce_change.astype(np.int64, copy=False)
+        pe_change = pe_change.astype(np.int64, copy=False)
         
-        put_oi_increase = df[df['PE_changeInOI'] > 0]['PE_changeInOI'].sum()
-        put_oi_decrease = abs(df[df['PE_changeInOI'] < 0]['PE_changeInOI'].sum())
+        # Negative part as a masked dot product (no gather); positive part
+        # follows from the column total
+        call_oi_decrease = -np.dot(ce_change, ce_change < 0)
+        call_oi_increase = ce_change.sum() + call_oi_decrease
         
-        return {
-            'call_build': call_oi_increase > call_oi_decrease,
-            'put_build': put_oi_increase > put_oi_decrease,
-            'net_call_change': call_oi_increase - call_oi_decrease,
-            'net_put_change': put_oi_increase - put_oi_decrease,
-        }
-
+        put_oi_decrease = -np.dot(pe_change, pe_change < 0)
+        put_oi_increase = pe_change.sum() + put_oi_decrease
+        
+        return OIAnalysis(
+            call_build=bool(call_oi_increase > call_oi_decrease),
+            put_build=bool(put_oi_increase > put_oi_decrease),
+            net_call_change=int(call_oi_increase - call_oi_decrease),
+            net_put_change=int(put_oi_increase - put_oi_decrease),
+        )
 
 if __name__ == "__main__":
     print("Analyzer module loaded successfully")
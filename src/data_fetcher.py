@@ -4,19 +4,31 @@ Handles all data fetching operations from NSE
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import json
 import time
-import random
 import logging
-from typing import Dict, Optional
+from datetime import datetime, timedelta, time as dt_time
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import pytz
 import sys
 import os
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import NSEConfig
 from utils.nse_bypass import NSEBypass
 from utils.rate_limiter import RateLimiter
+from utils.cache import FileCache
 
 logger = logging.getLogger(__name__)
 
@@ -26,37 +38,125 @@ class NSEDataFetcher:
     Fetches option chain data from NSE with anti-blocking measures
     """
     
+    INDEX_SYMBOLS = frozenset(NSEConfig.INDEX_SYMBOLS)
+    MARKET_TZ = pytz.timezone('Asia/Kolkata')
+    MARKET_OPEN = dt_time(9, 15)
+    MARKET_CLOSE = dt_time(15, 30)
+    
     def __init__(self):
         self.session = requests.Session()
-        self.bypass = NSEBypass(self.session)
+        retry = Retry(
+            total=NSEConfig.MAX_RETRIES,
+            backoff_factor=NSEConfig.RETRY_BACKOFF,
+            status_forcelist=NSEConfig.RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET'])
+        )
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=NSEConfig.POOL_CONNECTIONS,
+            pool_maxsize=NSEConfig.POOL_MAXSIZE,
+            max_retries=retry
+        ))
+        self.bypass = NSEBypass(
+            self.session,
+            cookie_file=NSEConfig.COOKIE_FILE,
+            cookie_max_age=NSEConfig.COOKIE_MAX_AGE
+        )
         self.rate_limiter = RateLimiter(
             min_delay=NSEConfig.MIN_REQUEST_DELAY,
             max_delay=NSEConfig.MAX_REQUEST_DELAY
         )
         self.cookies = None
+        self._cookies_changed = False
+        self.cache = FileCache(NSEConfig.CACHE_DIR)
         
+        # Reuse cookies from a previous run; a 401 still forces a refresh
+        if self.bypass.load_cookies():
+            self.cookies = self.session.cookies
+    
+    @classmethod
+    def is_market_hours(cls) -> bool:
+        """Check whether NSE is currently in its trading session"""
+        now = datetime.now(cls.MARKET_TZ)
+        return now.weekday() < 5 and cls.MARKET_OPEN <= now.time() <= cls.MARKET_CLOSE
+    
+    @classmethod
+    def last_market_close(cls) -> float:
+        """Epoch time of the most recent weekday 15:30 IST close"""
+        now = datetime.now(cls.MARKET_TZ)
+        close = now.replace(hour=cls.MARKET_CLOSE.hour, minute=cls.MARKET_CLOSE.minute,
+                            second=0, microsecond=0)
+        if now < close:
+            close -= timedelta(days=1)
+        while close.weekday() >= 5:
+            close -= timedelta(days=1)
+        return close.timestamp()
+    
+    @classmethod
+    def cache_ttl(cls, written_at: float) -> float:
+        """
+        TTL for a cached snapshot, based on when it was written
+        
+        Only snapshots taken after the latest close are final for the day;
+        anything captured mid-session expires on the short market-hours TTL.
+        """
+        if not cls.is_market_hours() and written_at >= cls.last_market_close():
+            return NSEConfig.CACHE_TTL_OFF_HOURS
+        return NSEConfig.CACHE_TTL
+    
+    def _ensure_cookies(self) -> bool:
+        """Get fresh cookies if not available"""
+        if not self.cookies:
+            if not self.bypass.get_cookies():
+                return False
+            self.cookies = self.session.cookies
+            self._cookies_changed = True
+            time.sleep(1)
+        return True
+    
+    def _save_cookies(self):
+        """Persist cookies picked up since the last save (warm-up or rotation)"""
+        if self._cookies_changed:
+            self._cookies_changed = False
+            self.bypass.save_cookies()
+        
+    @staticmethod
+    def _has_records(data: Optional[Dict]) -> bool:
+        """Check that an option chain payload actually contains strike data"""
+        return bool(data) and bool(data.get('records', {}).get('data'))
+    
     def fetch_option_chain(self, symbol: str = 'NIFTY') -> Optional[Dict]:
         """
         Fetch option chain data from NSE
         
         Args:
-            symbol: Index symbol (NIFTY, BANKNIFTY, etc.)
+            symbol: Index (NIFTY, BANKNIFTY, etc.) or equity symbol
             
         Returns:
             Option chain data as dictionary or None
         """
+        data = self._fetch(symbol)
+        self._save_cookies()
+        return data
+    
+    def _fetch(self, symbol: str) -> Optional[Dict]:
+        """Fetch one option chain without persisting cookies (thread-safe)"""
+        # Serve recent snapshots from disk; NSE refreshes every few minutes
+        cached = self.cache.get(symbol, ttl_seconds=self.cache_ttl)
+        if self._has_records(cached):
+            logger.info(f"✓ Using cached option chain for {symbol}")
+            return cached
+        
         # Apply rate limiting
         self.rate_limiter.wait()
         
         # Get fresh cookies if not available
-        if not self.cookies:
-            if not self.bypass.get_cookies():
-                return None
-            self.cookies = self.session.cookies
-            time.sleep(1)
+        if not self._ensure_cookies():
+            return None
         
         try:
-            url = f"{NSEConfig.OPTION_CHAIN_URL}?symbol={symbol}"
+            base_url = (NSEConfig.OPTION_CHAIN_URL if symbol in self.INDEX_SYMBOLS
+                        else NSEConfig.OPTION_CHAIN_EQUITY_URL)
+            url = f"{base_url}?symbol={symbol}"
             
             response = self.session.get(
                 url,
@@ -64,15 +164,31 @@ class NSEDataFetcher:
                 timeout=NSEConfig.REQUEST_TIMEOUT
             )
             
+            if response.status_code in (401, 403):
+                # Unauthorized - refresh cookies and retry once
+                logger.warning("Unauthorized - refreshing cookies")
+                self.cookies = None
+                if not self._ensure_cookies():
+                    return None
+                response = self.session.get(
+                    url,
+                    cookies=self.cookies,
+                    timeout=NSEConfig.REQUEST_TIMEOUT
+                )
+            
             if response.status_code == 200:
-                data = response.json()
+                # Decode the (already decompressed) body bytes directly
+                data = _json_loads(response.content)
                 logger.info(f"✓ Successfully fetched option chain for {symbol}")
+                # NSE answers blocked requests with 200 and an empty body;
+                # only cache real snapshots so a block isn't replayed for hours
+                if self._has_records(data):
+                    self.cache.set(symbol, data)
+                    # NSE rotates its cookies on API responses; saved by the caller
+                    self._cookies_changed = True
+                else:
+                    logger.warning(f"No option chain records in response for {symbol}")
                 return data
-            elif response.status_code == 401:
-                # Unauthorized - refresh cookies
-                logger.warning("Unauthorized - refreshing cookies")
-                self.cookies = None
-                return self.fetch_option_chain(symbol)
             else:
                 logger.error(f"Failed to fetch data: {response.status_code}")
                 return None
@@ -81,6 +197,30 @@ class NSEDataFetcher:
             logger.error(f"Error fetching option chain: {str(e)}")
             return None
     
+    def fetch_multiple(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Fetch option chain data for several symbols concurrently
+        
+        Requests share the pooled session and the rate limiter, so network
+        latency overlaps while the request rate stays within budget.
+        
+        Args:
+            symbols: Index symbols to fetch
+            
+        Returns:
+            Mapping of symbol to option chain data (None on failure)
+        """
+        # Seed cookies up front so worker threads don't race on the warm-up
+        if not self._ensure_cookies():
+            return {symbol: None for symbol in symbols}
+        
+        with ThreadPoolExecutor(max_workers=NSEConfig.MAX_WORKERS) as executor:
+            results = dict(zip(symbols, executor.map(self._fetch, symbols)))
+        
+        # Save once the workers are done, so no thread rewrites the cookie file
+        self._save_cookies()
+        return results
+    
     def get_spot_price(self, data: Dict) -> float:
         """Extract current spot price from option chain data"""
         try:
@@ -53,20 +53,26 @@ class OptionIndicators:
         df['CE_spread_pct'] = ((df['CE_ask'] - df['CE_bid']) / df['CE_LTP'] * 100).replace([np.inf, -np.inf], 0)
         df['PE_spread_pct'] = ((df['PE_ask'] - df['PE_bid']) / df['PE_LTP'] * 100).replace([np.inf, -np.inf], 0)
         
-        liquid_ce = df[(df['CE_spread_pct'] < AnalysisConfig.MAX_SPREAD_PCT) & 
-                       (df['CE_volume'] > AnalysisConfig.MIN_VOLUME)]
-        liquid_pe = df[(df['PE_spread_pct'] < AnalysisConfig.MAX_SPREAD_PCT) & 
-                       (df['PE_volume'] > AnalysisConfig.MIN_VOLUME)]
+        # Count liquid strikes on the raw arrays instead of filtering the frame
+        liquid_ce = int(np.count_nonzero(
+            (df['CE_spread_pct'].to_numpy() < AnalysisConfig.MAX_SPREAD_PCT) &
+            (df['CE_volume'].to_numpy() > AnalysisConfig.MIN_VOLUME)
+        ))
+        liquid_pe = int(np.count_nonzero(
+            (df['PE_spread_pct'].to_numpy() < AnalysisConfig.MAX_SPREAD_PCT) &
+            (df['PE_volume'].to_numpy() > AnalysisConfig.MIN_VOLUME)
+        ))
         
+        # Zero-LTP rows give NaN spreads, so keep pandas' NaN-skipping mean here
         avg_ce_spread = df['CE_spread_pct'].mean()
         avg_pe_spread = df['PE_spread_pct'].mean()
         
         return {
-            'liquid_ce_strikes': len(liquid_ce),
-            'liquid_pe_strikes': len(liquid_pe),
+            'liquid_ce_strikes': liquid_ce,
+            'liquid_pe_strikes': liquid_pe,
             'avg_ce_spread': round(avg_ce_spread, 2),
             'avg_pe_spread': round(avg_pe_spread, 2),
-            'recommendation': 'Good' if len(liquid_ce) > AnalysisConfig.MIN_LIQUID_STRIKES else 'Poor'
+            'recommendation': 'Good' if liquid_ce > AnalysisConfig.MIN_LIQUID_STRIKES else 'Poor'
         }
     
     @staticmethod
@@ -78,12 +84,15 @@ class OptionIndicators:
         high_activity_ce = df[df['CE_vol_oi_ratio'] > AnalysisConfig.HIGH_ACTIVITY_RATIO].nlargest(5, 'CE_volume')
         high_activity_pe = df[df['PE_vol_oi_ratio'] > AnalysisConfig.HIGH_ACTIVITY_RATIO].nlargest(5, 'PE_volume')
         
+        avg_ce_ratio = df['CE_vol_oi_ratio'].mean()
+        avg_pe_ratio = df['PE_vol_oi_ratio'].mean()
+        
         return {
             'high_activity_ce_strikes': high_activity_ce['strike'].tolist(),
             'high_activity_pe_strikes': high_activity_pe['strike'].tolist(),
-            'avg_ce_ratio': round(df['CE_vol_oi_ratio'].mean(), 3),
-            'avg_pe_ratio': round(df['PE_vol_oi_ratio'].mean(), 3),
-            'interpretation': 'High momentum' if df['CE_vol_oi_ratio'].mean() > AnalysisConfig.MODERATE_ACTIVITY_RATIO else 'Consolidation'
+            'avg_ce_ratio': round(avg_ce_ratio, 3),
+            'avg_pe_ratio': round(avg_pe_ratio, 3),
+            'interpretation': 'High momentum' if avg_ce_ratio > AnalysisConfig.MODERATE_ACTIVITY_RATIO else 'Consolidation'
         }
     
     @staticmethod
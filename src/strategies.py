@@ -9,7 +9,7 @@ import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config import TradingConfig, AnalysisConfig
+from config import AnalysisConfig
 
 
 class StrategyGenerator:
@@ -87,7 +87,7 @@ class StrategyGenerator:
         if vol_oi['interpretation'] != 'High momentum':
             return None
         
-        if oi_changes['call_build'] and not oi_changes['put_build']:
+        if oi_changes.call_build and not oi_changes.put_build:
             return {
                 'name': 'OI Momentum - Call Writing Detected',
                 'type': 'PUT_BUY',
@@ -95,7 +95,7 @@ class StrategyGenerator:
                 'confidence': 'MEDIUM',
                 'timeframe': 'Intraday'
             }
-        elif oi_changes['put_build'] and not oi_changes['call_build']:
+        elif oi_changes.put_build and not oi_changes.call_build:
             return {
                 'name': 'OI Momentum - Put Writing Detected',
                 'type': 'CALL_BUY',
@@ -0,0 +1,75 @@
+"""
+File Cache Utility
+Stores JSON responses on disk to avoid refetching unchanged data
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class FileCache:
+    """
+    JSON file cache with per-entry TTL validation
+    """
+
+    def __init__(self, cache_dir: str = '.cache'):
+        self.cache_dir = cache_dir
+
+    def _path(self, key: str) -> str:
+        """Map a cache key to its file path"""
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key: str,
+            ttl_seconds: Union[float, Callable[[float], float]]) -> Optional[Any]:
+        """
+        Return the cached value for key, or None if missing, expired or empty
+
+        ttl_seconds may also be a callable that maps the entry's write time
+        to its TTL, for entries whose lifetime depends on when they were taken.
+        """
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        written_at = entry.get('timestamp', 0)
+        if callable(ttl_seconds):
+            ttl_seconds = ttl_seconds(written_at)
+        if time.time() - written_at > ttl_seconds:
+            return None
+
+        # Empty values are never worth serving; treat them as a miss
+        value = entry.get('value')
+        if not value:
+            return None
+
+        logger.debug(f"Cache hit: {key}")
+        return value
+
+    def set(self, key: str, value: Any):
+        """Store value under key with the current timestamp"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+
+            with open(tmp_path, 'w') as f:
+                json.dump({'timestamp': time.time(), 'value': value}, f)
+            os.replace(tmp_path, path)
+
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {key}: {str(e)}")
+
+
+if __name__ == "__main__":
+    cache = FileCache()
+    cache.set('example', {'value': 1})
+    print(cache.get('example', ttl_seconds=60))
@@ -3,8 +3,12 @@ NSE Bypass Utilities
 Handles headers and session management to avoid blocking
 """
 
+import os
+import time
 import requests
 import logging
+from http.cookiejar import LWPCookieJar, LoadError
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +23,7 @@ class NSEBypass:
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         'Accept': 'application/json, text/plain, */*',
         'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
+        'Accept-Encoding': 'gzip, deflate',
         'Connection': 'keep-alive',
         'DNT': '1',
         'Pragma': 'no-cache',
@@ -27,9 +31,12 @@ class NSEBypass:
         'Referer': 'https://www.nseindia.com/option-chain'
     }
     
-    def __init__(self, session: requests.Session):
+    def __init__(self, session: requests.Session, cookie_file: Optional[str] = None,
+                 cookie_max_age: float = 1800):
         self.session = session
         self.session.headers.update(self.HEADERS)
+        self.cookie_file = cookie_file
+        self.cookie_max_age = cookie_max_age
     
     def get_cookies(self) -> bool:
         """Get session cookies from NSE"""
@@ -47,6 +54,51 @@ class NSEBypass:
         except Exception as e:
             logger.error(f"Error getting cookies: {str(e)}")
             return False
+    
+    def load_cookies(self) -> bool:
+        """Load cookies saved by a previous run, if any are still valid"""
+        if not self.cookie_file:
+            return False
+        
+        jar = LWPCookieJar(self.cookie_file)
+        try:
+            saved_at = os.path.getmtime(self.cookie_file)
+            jar.load(ignore_discard=True)
+        except (OSError, LoadError):
+            return False
+        
+        jar.clear_expired_cookies()
+        
+        # Session cookies never expire on their own; drop them once the
+        # saved jar is older than the allowed age
+        if time.time() - saved_at > self.cookie_max_age:
+            jar.clear_session_cookies()
+        
+        if not len(jar):
+            return False
+        
+        for cookie in jar:
+            self.session.cookies.set_cookie(cookie)
+        logger.info("✓ Loaded saved NSE cookies")
+        return True
+    
+    def save_cookies(self):
+        """Persist current session cookies for the next run"""
+        if not self.cookie_file:
+            return
+        
+        try:
+            jar = LWPCookieJar()
+            for cookie in self.session.cookies:
+                jar.set_cookie(cookie)
+            
+            # Write to a temp file and swap it in, so readers never see a partial jar
+            os.makedirs(os.path.dirname(self.cookie_file) or '.', exist_ok=True)
+            tmp_file = f"{self.cookie_file}.{os.getpid()}.tmp"
+            jar.save(tmp_file, ignore_discard=True)
+            os.replace(tmp_file, self.cookie_file)
+        except Exception as e:
+            logger.warning(f"Failed to save cookies: {str(e)}")
 
 
 if __name__ == "__main__":
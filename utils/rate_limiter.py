@@ -6,6 +6,7 @@ Prevents too frequent requests to avoid blocking
 import time
 import random
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -13,28 +14,37 @@ logger = logging.getLogger(__name__)
 class RateLimiter:
     """
     Implements rate limiting between requests
+
+    A single instance can be shared by several threads: callers queue on
+    an internal lock and only sleep for whatever remains of the interval
+    since the previous request, so no fixed per-request pause is needed.
     """
     
     def __init__(self, min_delay: float = 3, max_delay: float = 5):
         self.min_delay = min_delay
         self.max_delay = max_delay
-        self.last_request_time = 0
+        # None until the first request (monotonic time has no fixed origin)
+        self.last_request_time = None
+        self._lock = threading.Lock()
     
     def wait(self):
         """Wait before next request"""
-        elapsed = time.time() - self.last_request_time
-        delay = random.uniform(self.min_delay, self.max_delay)
-        
-        if elapsed < delay:
-            sleep_time = delay - elapsed
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        with self._lock:
+            if self.last_request_time is not None:
+                elapsed = time.monotonic() - self.last_request_time
+                delay = random.uniform(self.min_delay, self.max_delay)
+                
+                if elapsed < delay:
+                    sleep_time = delay - elapsed
+                    logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f}s")
+                    time.sleep(sleep_time)
+            
+            self.last_request_time = time.monotonic()
     
     def reset(self):
         """Reset the rate limiter"""
-        self.last_request_time = 0
+        with self._lock:
+            self.last_request_time = None
 
 
 if __name__ == "__main__":